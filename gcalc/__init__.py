@@ -1,9 +1,12 @@
 from sys import argv
 
-from gcalc.commandline import GCalc
+from gcalc.session import GCalcSession, SessionError
 
 
 def main():
+    # imported here so that using GCalcSession does not pull in rich/argparse
+    from gcalc.commandline import GCalc
+
     c = GCalc()
     line: str = ' '.join(argv[1:])
     stop = c.onecmd(line)
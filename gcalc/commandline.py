@@ -1,19 +1,25 @@
 import argparse
 import cmd
-import json
 import os
-import platform
+import time
 
 import rich.style
-from rich.console import Console
+from rich.align import Align
+from rich.console import Console, Group
+from rich.live import Live
 from rich.table import Table
 from rich.style import Style
 from rich.color import Color
 
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 from gcalc.course import Course
-from gcalc.assignment import Assignment
+from gcalc.session import (
+    GCalcSession,
+    SessionError,
+    default_courses_file,
+    home_directory
+)
 from gcalc.namespaces import (
     NsAdd,
     NsBase,
@@ -46,14 +52,10 @@ info_str = "[bold blue][*][/bold blue]"
 dry_str = "[bold green][DRY RUN][/bold green]"
 
 # check home directory
-current_os = platform.system()
-home_dir = ""
-if current_os == "Linux":
-    home_dir = os.environ["HOME"]
-elif current_os == "Windows":
-    home_dir = os.environ["HOMEPATH"]
-else:
-    console.print(f"{error_str} Operating system not supported")
+try:
+    home_dir = home_directory()
+except SessionError as e:
+    console.print(f"{error_str} {str(e)}")
     exit(0)
 
 grades_dir = os.path.join(home_dir, ".grades")
@@ -63,21 +65,22 @@ class GCalc(cmd.Cmd):
     def __init__(self):
         super().__init__()
 
-        self.courses: Dict[str, Course] = {}
         self.courses_old: Dict[str, Course] = {}
-        self.courses_file: str = os.getenv(
-            "GCALC_COURSES_FILE",
-            os.path.join(home_dir, ".courses.json")
-        )
+        self.courses_file: str = default_courses_file()
         self.dry_run: bool = False
         self.message: Optional[str] = None
         self.verbose: bool = False
 
+        self.session = GCalcSession(self.courses_file, autocommit=False, load=False)
         self._load_courses()
 
+    @property
+    def courses(self) -> Dict[str, Course]:
+        return self.session.courses
+
     def postcmd(self, stop: bool, line: str) -> bool:
         if not self.dry_run:
-            self._save_courses()
+            self.session.commit()
         elif self.message is not None:
             console.print(f"{dry_str} {self.message}")
 
@@ -103,40 +106,11 @@ class GCalc(cmd.Cmd):
             console.print(f"{error_str} {e.message}")
             return False
 
-    def _check_courses_file(self) -> Optional[Any]:
-        try:
-            with open(self.courses_file, "r") as f:
-                courses = json.loads(f.read())
-            return courses
-        except FileNotFoundError as e:
-            # console.print(f"{error_str} {str(e)}")
-            return None
-        except json.JSONDecodeError as e:
-            console.print(f"{error_str} Json error: {str(e)}")
-            return None
-
     def _load_courses(self) -> None:
-        courses = self._check_courses_file()
-        if not courses:
-            return
-
-        if not isinstance(courses, list):
-            console.print(
-                f"{error_str} The file {self.courses_file} does not contain a list of courses"
-            )
-            return
-
         try:
-            courses = [Course.from_dict(course) for course in courses]
-        except KeyError as e:
+            self.session.load()
+        except SessionError as e:
             console.print(f"{error_str} {str(e)}")
-            return
-
-        self.courses = {course._name: course for course in courses}
-
-    def _save_courses(self) -> None:
-        with open(self.courses_file, "w+") as f:
-            f.write(json.dumps([course.dict for course in self.courses.values()], indent=4))
 
     def _check_course(self, name: str) -> bool:
         if name not in self.courses:
@@ -164,7 +138,7 @@ class GCalc(cmd.Cmd):
 
         if self.verbose:
             console.print(f"{info_str} Added new course")
-        self.courses[name] = Course(name)
+        self.session.new_course(name, replace)
 
     def do_new(self, arg: str):
         """Create a new course"""
@@ -183,7 +157,7 @@ class GCalc(cmd.Cmd):
             return
 
         self.message = f"Remove course '{parsed.course}'"
-        self.courses.pop(parsed.course)
+        self.session.remove_course(parsed.course)
 
     def do_ls(self, _: str):
         """Print name of the every course"""
@@ -191,7 +165,7 @@ class GCalc(cmd.Cmd):
             console.print(str(course))
 
     @classmethod
-    def _print_course_table(cls, course: Course, show_grades: bool) -> None:
+    def _build_course_table(cls, course: Course, show_grades: bool) -> Table:
         table = Table(title=f"{str(course)} Assignments")
         table.add_column("Name")
         table.add_column("Weight")
@@ -224,19 +198,95 @@ class GCalc(cmd.Cmd):
         else:
             table.add_row("Total", total_weight, total_count)
 
-        console.print(table, justify="center")
+        return table
+
+    @classmethod
+    def _print_course_table(cls, course: Course, show_grades: bool) -> None:
+        console.print(cls._build_course_table(course, show_grades), justify="center")
 
     def _show_course(self, name: str, show_grades: bool):
         if self._check_course(name):
             self._print_course_table(self.courses[name], show_grades=show_grades)
 
+    def _refresh_tables(self,
+                        tables: Dict[str, Table],
+                        names: Optional[List[str]],
+                        show_grades: bool) -> Optional[Set[str]]:
+        """Reload the courses that changed on disk and rebuild only their
+        tables. Returns the changed course names or None if the file could
+        not be read"""
+        try:
+            changed = self.session.reload_changed(names)
+        except SessionError:
+            return None
+
+        # only the changed courses get their grades recalculated
+        for name in changed:
+            if name in self.courses:
+                tables[name] = self._build_course_table(self.courses[name], show_grades)
+            else:
+                tables.pop(name, None)
+
+        return changed
+
+    def _render_tables(self, tables: Dict[str, Table]) -> Group:
+        if not tables:
+            return Group(f"{warn_str} No courses to show in {self.courses_file}")
+        return Group(*(Align.center(tables[name])
+                       for name in self.courses if name in tables))
+
+    def _watch_courses(self, parsed: NsShow) -> None:
+        if parsed.interval <= 0:
+            console.print(f"{error_str} '--interval' option should be a positive number")
+            return
+
+        names: Optional[List[str]] = None
+        if not parsed.show_all:
+            if not self._check_course(parsed.course):
+                return
+            names = [parsed.course]
+
+        tables: Dict[str, Table] = {
+            name: self._build_course_table(course, parsed.show_grades)
+            for name, course in self.courses.items()
+            if names is None or name in names
+        }
+
+        if self.verbose:
+            console.print(f"{info_str} Watching {self.courses_file}, press Ctrl+C to stop")
+
+        last_stat = self.session.courses_file_stat()
+        try:
+            with Live(self._render_tables(tables), console=console, auto_refresh=False) as live:
+                while True:
+                    time.sleep(parsed.interval)
+
+                    stat = self.session.courses_file_stat()
+                    if stat == last_stat:
+                        continue
+
+                    changed = self._refresh_tables(tables, names, parsed.show_grades)
+                    if changed is None:
+                        # the file may be mid-write, retry on the next poll
+                        continue
+
+                    last_stat = stat
+                    if changed:
+                        live.update(self._render_tables(tables), refresh=True)
+        except KeyboardInterrupt:
+            pass
+
     def do_show(self, arg: str):
         """Show a table of assignments of a course"""
         parsed: NsShow = NsShow()
         if not self._try_parse_args(get_show_parser(), parsed, arg):
             return
 
-        if parsed.show_all:
+        if parsed.watch:
+            # never write back to the file that is being watched
+            self.dry_run = True
+            self._watch_courses(parsed)
+        elif parsed.show_all:
             for course in self.courses.values():
                 self._print_course_table(course, parsed.show_grades)
         else:
@@ -258,79 +308,26 @@ class GCalc(cmd.Cmd):
 
         return True
 
-    def _check_assignment_args(self, args: NsAdd) -> bool:
-        result: bool = True
-
-        if args.weight is not None and args.weight <= 0:
-            console.print(f"{error_str} Assignment weight "
-                          f"should be a positive floating point number")
-            result = False
-
-        if args.count is not None and args.count <= 0:
-            console.print(f"{error_str} Number of assignments should be"
-                          f"a positive integer")
-            result = False
-
-        if args.out_of <= 0:
-            console.print(f"{error_str} '--outof' option should take positive integers")
-            result = False
-
-        if len(args.grades) > args.count:
-            console.print(f"{error_str} Total number of grades cannot exceed"
-                          f" number of assignments (--count option)")
-            result = False
-
-        if self.verbose and result:
-            console.print(f"{info_str} Given assignment '{args.name}' is valid")
-
-        return result
-
     def do_add(self, arg: str):
         """Add an assignment to a course"""
         parsed: NsAdd = NsAdd()
         if not self._try_parse_args(get_add_parser(), parsed, arg):
             return
 
-        if not self._check_assignment_args(parsed):
-            return
-
-        course = self.courses[parsed.course]
-
-        assignment = Assignment(
-            parsed.name, parsed.weight, parsed.count
-        )
-        assignment.grades = [100 * grade / parsed.out_of for grade in parsed.grades]
-
-        if not course.add_assignment(assignment):
-            self.message = "Assignment with the same name already exists"
+        try:
+            assignment = self.session.add_assignment(
+                parsed.course, parsed.name, parsed.weight, parsed.count,
+                parsed.grades, parsed.out_of
+            )
+        except SessionError as e:
+            self.message = str(e)
             console.print(f"{error_str} {self.message}")
-        else:
-            self.message = f"{repr(course)}"
-
-    @classmethod
-    def _update_grades(cls,
-                       assignment: Assignment,
-                       grades: List[float],
-                       out_of: int):
-        if len(grades) > assignment.count:
-            console.print(f"{error_str} Total number of grades cannot exceed"
-                          f" number of assignments (--count option)")
             return
 
-        assignment.grades.clear()
-        assignment.grades = [100 * grade / out_of for grade in grades]
-
-    @classmethod
-    def _append_grades(cls,
-                       assignment: Assignment,
-                       grades: List[float],
-                       out_of: int):
-        if len(grades) + len(assignment.grades) > assignment.count:
-            console.print(f"{error_str} Total number of grades cannot exceed"
-                          f" number of assignments (--count option)")
-            return
+        if self.verbose:
+            console.print(f"{info_str} Given assignment '{assignment.name}' is valid")
 
-        assignment.grades += [100 * grade / out_of for grade in grades]
+        self.message = f"{repr(self.courses[parsed.course])}"
 
     def do_edit(self, arg: str):
         """Edit an existing assignment in a course"""
@@ -345,29 +342,27 @@ class GCalc(cmd.Cmd):
             console.print(f"{info_str} Editing assignment '{parsed.name}' "
                           f"in course '{parsed.course}'")
 
-        course = self.courses[parsed.course]
-
         if parsed.rm:
+            try:
+                self.session.remove_assignment(parsed.course, parsed.name)
+            except SessionError as e:
+                console.print(f"{error_str} {str(e)}")
+                return
+
             self.message = f"Removing assignment '{parsed.name}'"
-            course.remove_assignment(parsed.name)
             return
 
-        assignment = course.assignments[parsed.name]
-
-        if parsed.weight is not None:
-            assignment.weight = parsed.weight
-
-        if parsed.count is not None:
-            assignment.count = parsed.count
-        else:
-            parsed.count = assignment.count
+        grades: Optional[List[float]] = None
+        if parsed.update or parsed.append:
+            grades = parsed.grades
 
-        if not self._check_assignment_args(parsed):
+        try:
+            assignment = self.session.edit_assignment(
+                parsed.course, parsed.name, parsed.weight, parsed.count,
+                grades, parsed.out_of, append=parsed.append
+            )
+        except SessionError as e:
+            console.print(f"{error_str} {str(e)}")
             return
 
-        if parsed.update:
-            self._update_grades(assignment, parsed.grades, parsed.out_of)
-        elif parsed.append:
-            self._append_grades(assignment, parsed.grades, parsed.out_of)
-
         self.message = f"Assignment after update/append:\n{repr(assignment)}"
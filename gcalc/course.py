@@ -25,7 +25,7 @@ class Course:
 
     @property
     def name(self) -> str:
-        return self.name
+        return self._name
 
     @property
     def dict(self) -> "Course.DICT_TYPE":
@@ -16,6 +16,8 @@ class NsNew(NsBase):
 class NsShow(NsBase):
     show_grades: bool
     show_all: bool
+    watch: bool
+    interval: float
 
 
 class NsAddBase(NsBase):
@@ -34,6 +34,10 @@ def get_show_parser() -> ArgumentParser:
                         help="Also show total grade of each assignment")
     parser.add_argument("-a", "--all", dest="show_all", action="store_true",
                         help="Show every course instead of just one")
+    parser.add_argument("--watch", dest="watch", action="store_true",
+                        help="Keep running and re-render the table(s) whenever the courses file changes")
+    parser.add_argument("--interval", dest="interval", default=1.0,
+                        type=float, help="Seconds between checks of the courses file in --watch mode")
     return parser
 
 
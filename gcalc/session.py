@@ -0,0 +1,313 @@
+import copy
+import json
+import os
+import platform
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from gcalc.assignment import Assignment
+from gcalc.course import Course
+
+
+class SessionError(Exception):
+    """Raised when an operation on a session cannot be completed"""
+
+
+def home_directory() -> str:
+    current_os = platform.system()
+    if current_os == "Linux":
+        return os.environ["HOME"]
+    elif current_os == "Windows":
+        return os.environ["HOMEPATH"]
+
+    raise SessionError("Operating system not supported")
+
+
+def default_courses_file() -> str:
+    courses_file = os.getenv("GCALC_COURSES_FILE")
+    if courses_file is not None:
+        return courses_file
+
+    return os.path.join(home_directory(), ".courses.json")
+
+
+class GCalcSession:
+    """Programmatic access to the courses file.
+
+    Methods return data instead of printing and raise `SessionError` on
+    invalid input. With `autocommit` every successful change is written to
+    the courses file right away, otherwise nothing is written until `commit`
+    is called. Changes made inside `transaction` are written once at the end
+    of the outermost block when `autocommit` is set, and are left pending
+    for `commit` otherwise. If the block raises, they are rolled back.
+    """
+
+    def __init__(self,
+                 courses_file: Optional[str] = None,
+                 autocommit: bool = True,
+                 load: bool = True):
+        self.courses_file: str = courses_file or default_courses_file()
+        self.autocommit: bool = autocommit
+        self.courses: Dict[str, Course] = {}
+
+        # course entries as last read from/written to the courses file
+        self._raw: Dict[str, Course.DICT_TYPE] = {}
+        self._transaction_depth: int = 0
+        self._dirty: bool = False
+
+        if load:
+            self.load()
+
+    def _read_courses_file(self) -> Dict[str, Course.DICT_TYPE]:
+        try:
+            with open(self.courses_file, "r") as f:
+                courses = json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            raise SessionError(f"Json error: {str(e)}") from e
+
+        if not courses:
+            return {}
+
+        if not isinstance(courses, list):
+            raise SessionError(
+                f"The file {self.courses_file} does not contain a list of courses"
+            )
+
+        return self._index_courses(courses)
+
+    @staticmethod
+    def _index_courses(courses: List[Any]) -> Dict[str, Course.DICT_TYPE]:
+        return {
+            course["name"]: course for course in courses
+            if isinstance(course, dict) and "name" in course
+        }
+
+    @staticmethod
+    def _parse_courses(raw: Dict[str, Course.DICT_TYPE]) -> Dict[str, Course]:
+        try:
+            return {name: Course.from_dict(course) for name, course in raw.items()}
+        except KeyError as e:
+            raise SessionError(str(e)) from e
+
+    def load(self) -> None:
+        """Replace the courses in the session with the ones in the courses file"""
+        raw = self._read_courses_file()
+        self.courses = self._parse_courses(raw)
+        self._raw = raw
+        self._dirty = False
+
+    def reload_changed(self, names: Optional[Sequence[str]] = None) -> Set[str]:
+        """Re-parse only the courses whose entries in the courses file changed
+        since they were last read or written, optionally limited to `names`.
+        Returns the names of added, changed and removed courses"""
+        if self._dirty:
+            raise SessionError("Session has uncommitted changes")
+
+        raw = self._read_courses_file()
+        if names is not None:
+            raw = {name: course for name, course in raw.items() if name in names}
+
+        old = {
+            name: course for name, course in self._raw.items()
+            if names is None or name in names
+        }
+        removed = old.keys() - raw.keys()
+        changed = {
+            name: course for name, course in raw.items()
+            if old.get(name) != course
+        }
+
+        # parse everything before touching the session so that a bad entry
+        # leaves it unchanged
+        courses = self._parse_courses(changed)
+
+        for name in removed:
+            self.courses.pop(name, None)
+            self._raw.pop(name, None)
+        self.courses.update(courses)
+        self._raw.update(changed)
+
+        return removed | courses.keys()
+
+    def courses_file_stat(self) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the courses file, None if it is missing"""
+        try:
+            stat = os.stat(self.courses_file)
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def commit(self) -> None:
+        """Write every course in the session to the courses file. Cannot be
+        called inside a transaction, which could not be rolled back after"""
+        if self._transaction_depth > 0:
+            raise SessionError("Cannot commit inside a transaction")
+
+        content = json.dumps([course.dict for course in self.courses.values()], indent=4)
+        with open(self.courses_file, "w+") as f:
+            f.write(content)
+
+        self._raw = self._index_courses(json.loads(content))
+        self._dirty = False
+
+    @contextmanager
+    def transaction(self) -> Iterator["GCalcSession"]:
+        """Group several changes into a single commit, rolling all of them
+        back if the block raises. Nothing is written if `autocommit` is not
+        set, the changes stay pending until `commit`"""
+        snapshot = copy.deepcopy(self.courses)
+        dirty = self._dirty
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.courses = snapshot
+            self._dirty = dirty
+            raise
+        finally:
+            self._transaction_depth -= 1
+
+        if self._transaction_depth == 0 and self.autocommit and self._dirty:
+            self.commit()
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if self.autocommit and self._transaction_depth == 0:
+            self.commit()
+
+    def get_course(self, name: str) -> Course:
+        name = name.casefold()
+        if name not in self.courses:
+            raise SessionError(f"Could not found course with name '{name}'")
+        return self.courses[name]
+
+    def get_assignment(self, course: str, name: str) -> Assignment:
+        assignments = self.get_course(course).assignments
+        name = name.casefold()
+        if name not in assignments:
+            raise SessionError(f"Could not found assignment with name '{name}'")
+        return assignments[name]
+
+    def new_course(self, name: str, replace: bool = False) -> Course:
+        """Create a new course, replacing an existing one only if `replace`
+        is set"""
+        name = name.casefold()
+        if name in self.courses and not replace:
+            raise SessionError(f"Course '{name}' already exists")
+
+        course = Course(name)
+        self.courses[name] = course
+        self._changed()
+        return course
+
+    def remove_course(self, name: str) -> Course:
+        course = self.courses.pop(self.get_course(name).name)
+        self._changed()
+        return course
+
+    @staticmethod
+    def _check_assignment(weight: Optional[float], count: Optional[int]) -> None:
+        if weight is not None and weight <= 0:
+            raise SessionError("Assignment weight "
+                               "should be a positive floating point number")
+
+        if count is not None and count <= 0:
+            raise SessionError("Number of assignments should be "
+                               "a positive integer")
+
+    @staticmethod
+    def _scale_grades(grades: Sequence[float], out_of: int) -> List[float]:
+        if out_of <= 0:
+            raise SessionError("'out_of' should be a positive integer")
+
+        return [100 * grade / out_of for grade in grades]
+
+    @staticmethod
+    def _check_grade_count(grades: Sequence[float], count: int) -> None:
+        if len(grades) > count:
+            raise SessionError("Total number of grades cannot exceed"
+                               " number of assignments")
+
+    def add_assignment(self,
+                       course: str,
+                       name: str,
+                       weight: float,
+                       count: int,
+                       grades: Sequence[float] = (),
+                       out_of: int = 100) -> Assignment:
+        c = self.get_course(course)
+        name = name.casefold()
+        if name in c.assignments:
+            raise SessionError("Assignment with the same name already exists")
+
+        self._check_assignment(weight, count)
+        self._check_grade_count(grades, count)
+        assignment = Assignment(name, weight, count)
+        assignment.grades = self._scale_grades(grades, out_of)
+
+        c.add_assignment(assignment)
+        self._changed()
+        return assignment
+
+    def edit_assignment(self,
+                        course: str,
+                        name: str,
+                        weight: Optional[float] = None,
+                        count: Optional[int] = None,
+                        grades: Optional[Sequence[float]] = None,
+                        out_of: int = 100,
+                        append: bool = False) -> Assignment:
+        """Change the weight and/or count of the assignment and replace its
+        grades with `grades`, or append them if `append` is set. Only the
+        resulting assignment is validated"""
+        assignment = self.get_assignment(course, name)
+        self._check_assignment(weight, count)
+
+        new_weight = assignment.weight if weight is None else weight
+        new_count = assignment.count if count is None else count
+        new_grades = assignment.grades
+        if grades is not None:
+            scaled = self._scale_grades(grades, out_of)
+            new_grades = assignment.grades + scaled if append else scaled
+        self._check_grade_count(new_grades, new_count)
+
+        if (new_weight, new_count, new_grades) == \
+                (assignment.weight, assignment.count, assignment.grades):
+            return assignment
+
+        assignment.weight = new_weight
+        assignment.count = new_count
+        assignment.grades = new_grades
+        self._changed()
+        return assignment
+
+    def update_grades(self,
+                      course: str,
+                      name: str,
+                      grades: Sequence[float],
+                      out_of: int = 100) -> Assignment:
+        """Replace current grades of the assignment"""
+        return self.edit_assignment(course, name, grades=grades, out_of=out_of)
+
+    def append_grades(self,
+                      course: str,
+                      name: str,
+                      grades: Sequence[float],
+                      out_of: int = 100) -> Assignment:
+        """Append to current grades of the assignment"""
+        return self.edit_assignment(course, name, grades=grades, out_of=out_of,
+                                    append=True)
+
+    def remove_assignment(self, course: str, name: str) -> Assignment:
+        c = self.get_course(course)
+        assignment = c.remove_assignment(self.get_assignment(course, name).name)
+        self._changed()
+        return assignment
+
+    def totals(self, course: str) -> Dict[str, float]:
+        """Weighted total of each assignment and of the course under 'total'"""
+        return self.get_course(course).calculate_grades()
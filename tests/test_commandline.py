@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from gcalc.commandline import GCalc
+
+
+def _course(name, weight):
+    return {
+        "name": name,
+        "assignments": [
+            {"name": "hw", "weight": weight, "count": 2, "grades": [80.0, 90.0]}
+        ]
+    }
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.courses_file = os.path.join(self.tmp.name, "courses.json")
+        self._write([_course("math", 40), _course("physics", 30)])
+
+        env = mock.patch.dict(os.environ, {"GCALC_COURSES_FILE": self.courses_file})
+        env.start()
+        self.addCleanup(env.stop)
+
+        self.gcalc = GCalc()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, courses):
+        with open(self.courses_file, "w+") as f:
+            f.write(json.dumps(courses, indent=4))
+
+    def _watch_tables(self, names=None):
+        return {
+            name: self.gcalc._build_course_table(course, True)
+            for name, course in self.gcalc.courses.items()
+            if names is None or name in names
+        }
+
+    def test_refresh_rebuilds_only_changed(self):
+        tables = self._watch_tables()
+        math_table, physics_table = tables["math"], tables["physics"]
+
+        self._write([_course("math", 40), _course("physics", 60)])
+        changed = self.gcalc._refresh_tables(tables, None, True)
+
+        self.assertEqual(changed, {"physics"})
+        self.assertIs(tables["math"], math_table)
+        self.assertIsNot(tables["physics"], physics_table)
+        self.assertEqual(self.gcalc.courses["physics"].assignments["hw"].weight, 60)
+
+    def test_refresh_ignores_courses_not_watched(self):
+        tables = self._watch_tables(["math"])
+
+        self._write([_course("math", 40), _course("physics", 60)])
+        changed = self.gcalc._refresh_tables(tables, ["math"], True)
+
+        self.assertEqual(changed, set())
+        self.assertEqual(list(tables), ["math"])
+
+    def test_refresh_drops_removed_course(self):
+        tables = self._watch_tables()
+
+        self._write([_course("math", 40)])
+        changed = self.gcalc._refresh_tables(tables, None, True)
+
+        self.assertEqual(changed, {"physics"})
+        self.assertEqual(list(tables), ["math"])
+
+    def test_refresh_retries_partial_file(self):
+        tables = self._watch_tables()
+        physics_table = tables["physics"]
+
+        with open(self.courses_file, "w+") as f:
+            f.write('[{"name": "math", ')
+        self.assertIsNone(self.gcalc._refresh_tables(tables, None, True))
+        self.assertIs(tables["physics"], physics_table)
+
+        self._write([_course("math", 40), _course("physics", 60)])
+        self.assertEqual(self.gcalc._refresh_tables(tables, None, True), {"physics"})
+
+    def test_watch_rejects_non_positive_interval(self):
+        with mock.patch("gcalc.commandline.Live") as live:
+            self.gcalc.onecmd("show -c math --watch --interval 0")
+
+        live.assert_not_called()
+
+
+class TestEdit(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.courses_file = os.path.join(self.tmp.name, "courses.json")
+        with open(self.courses_file, "w+") as f:
+            f.write(json.dumps([_course("math", 40)]))
+
+        env = mock.patch.dict(os.environ, {"GCALC_COURSES_FILE": self.courses_file})
+        env.start()
+        self.addCleanup(env.stop)
+
+        self.gcalc = GCalc()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_remove_missing_assignment(self):
+        with mock.patch("gcalc.commandline.console") as console:
+            self.gcalc.onecmd("edit -c math -n nope --rm")
+
+        self.assertIn("nope", console.print.call_args[0][0])
+        self.assertIn("hw", self.gcalc.courses["math"].assignments)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from gcalc.session import GCalcSession, SessionError
+
+
+class TestGCalcSession(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.courses_file = os.path.join(self.tmp.name, "courses.json")
+        self.session = GCalcSession(self.courses_file)
+        self.session.new_course("math")
+        self.session.add_assignment("math", "hw", 30, 3, [90, 80, 70])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _saved_assignment(self):
+        with open(self.courses_file, "r") as f:
+            return json.loads(f.read())[0]["assignments"][0]
+
+    def test_edit_lower_count_with_replaced_grades(self):
+        self.session.edit_assignment("math", "hw", count=2, grades=[50, 60])
+
+        saved = self._saved_assignment()
+        self.assertEqual(saved["count"], 2)
+        self.assertEqual(saved["grades"], [50.0, 60.0])
+
+    def test_edit_lower_count_below_grades(self):
+        with self.assertRaises(SessionError):
+            self.session.edit_assignment("math", "hw", count=2)
+
+        self.assertEqual(self._saved_assignment()["count"], 3)
+
+    def test_noop_edit_does_not_commit(self):
+        mtime = os.stat(self.courses_file).st_mtime_ns
+        os.utime(self.courses_file, ns=(mtime - 10 ** 9, mtime - 10 ** 9))
+
+        self.session.edit_assignment("math", "hw")
+
+        self.assertEqual(os.stat(self.courses_file).st_mtime_ns, mtime - 10 ** 9)
+
+    def test_reload_changed(self):
+        self.session.new_course("physics")
+        other = GCalcSession(self.courses_file)
+        other.add_assignment("physics", "lab", 20, 1, [100])
+
+        self.assertEqual(self.session.reload_changed(), {"physics"})
+        self.assertIn("lab", self.session.courses["physics"].assignments)
+        self.assertEqual(self.session.reload_changed(), set())
+
+    def test_reload_changed_with_uncommitted_changes(self):
+        session = GCalcSession(self.courses_file, autocommit=False)
+        session.new_course("physics")
+
+        with self.assertRaises(SessionError):
+            session.reload_changed()
+
+    def test_new_course_duplicate(self):
+        with self.assertRaises(SessionError):
+            self.session.new_course("MATH")
+
+        self.assertEqual(self.session.new_course("math", replace=True).assignments, {})
+
+    def test_add_assignment_validation(self):
+        invalid = [
+            dict(name="hw", weight=10, count=1),
+            dict(name="quiz", weight=0, count=1),
+            dict(name="quiz", weight=10, count=0),
+            dict(name="quiz", weight=10, count=1, grades=[1, 2]),
+            dict(name="quiz", weight=10, count=1, out_of=0),
+        ]
+        for kwargs in invalid:
+            with self.subTest(**kwargs), self.assertRaises(SessionError):
+                self.session.add_assignment("math", **kwargs)
+
+        with self.assertRaises(SessionError):
+            self.session.add_assignment("history", "quiz", 10, 1)
+
+        self.assertEqual(list(self.session.courses["math"].assignments), ["hw"])
+
+    def test_totals(self):
+        self.session.add_assignment("math", "final", 70, 1, [40], out_of=50)
+
+        totals = self.session.totals("math")
+        self.assertAlmostEqual(totals["hw"], 24.0)
+        self.assertAlmostEqual(totals["final"], 56.0)
+        self.assertAlmostEqual(totals["total"], 80.0)
+
+    def test_transaction_commits_once(self):
+        with mock.patch.object(self.session, "commit",
+                               wraps=self.session.commit) as commit:
+            with self.session.transaction():
+                self.session.new_course("physics")
+                self.session.add_assignment("physics", "lab", 20, 2)
+                self.session.append_grades("physics", "lab", [100])
+
+        commit.assert_called_once_with()
+        self.assertEqual(GCalcSession(self.courses_file).totals("physics")["lab"], 10.0)
+
+    def test_nested_transaction_commits_at_outermost(self):
+        with mock.patch.object(self.session, "commit",
+                               wraps=self.session.commit) as commit:
+            with self.session.transaction():
+                self.session.new_course("physics")
+                with self.session.transaction():
+                    self.session.new_course("history")
+                commit.assert_not_called()
+
+        commit.assert_called_once_with()
+        self.assertEqual(set(GCalcSession(self.courses_file).courses),
+                         {"math", "physics", "history"})
+
+    def test_transaction_rollback(self):
+        with self.assertRaises(SessionError):
+            with self.session.transaction():
+                self.session.new_course("physics")
+                self.session.update_grades("math", "hw", [10, 20])
+                self.session.append_grades("math", "hw", [30, 40])
+
+        self.assertNotIn("physics", self.session.courses)
+        self.assertEqual(self.session.get_assignment("math", "hw").grades,
+                         [90.0, 80.0, 70.0])
+        self.assertEqual(self._saved_assignment()["grades"], [90.0, 80.0, 70.0])
+
+    def test_nested_transaction_rollback(self):
+        with self.session.transaction():
+            self.session.new_course("physics")
+            with self.assertRaises(SessionError):
+                with self.session.transaction():
+                    self.session.new_course("history")
+                    self.session.remove_course("nope")
+
+        self.assertEqual(set(GCalcSession(self.courses_file).courses),
+                         {"math", "physics"})
+
+    def test_transaction_without_autocommit(self):
+        session = GCalcSession(self.courses_file, autocommit=False)
+        with session.transaction():
+            session.new_course("physics")
+
+        self.assertNotIn("physics", GCalcSession(self.courses_file).courses)
+        session.commit()
+        self.assertIn("physics", GCalcSession(self.courses_file).courses)
+
+    def test_commit_inside_transaction(self):
+        with self.assertRaises(SessionError):
+            with self.session.transaction():
+                self.session.new_course("physics")
+                self.session.commit()
+
+        self.assertNotIn("physics", self.session.courses)
+        self.assertNotIn("physics", GCalcSession(self.courses_file).courses)
+        self.assertEqual(self.session.reload_changed(), set())
+
+
+if __name__ == "__main__":
+    unittest.main()